@@ -1,65 +1,177 @@
 import os
 import re
 import threading
+import queue
 import asyncio
-import httpx
-from flask import Flask, request, jsonify, render_template, send_file
+import hashlib
+import aiohttp
+from quart import Quart, request, render_template, send_file
+from selectolax.lexbor import LexborHTMLParser
+import uvicorn
+import orjson
 import pandas as pd
-from bs4 import BeautifulSoup
+import pyarrow as pa
+import pyarrow.parquet as pq
 from io import BytesIO
+from collections import OrderedDict
+
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 # --- Configuration ---
-app = Flask(__name__)
-EXCEL_FILE = 'scraped_data.xlsx'
+app = Quart(__name__)
+DATA_DIR = 'scraped_data.parquet'  # Append-only Parquet dataset, one file per save
+LEGACY_EXCEL_FILE = 'scraped_data.xlsx'  # Previous store, imported into DATA_DIR once
+DATA_SCHEMA = pa.schema([('Email', pa.string()), ('Mobile Number', pa.string())])
 file_lock = threading.Lock()
+save_queue = queue.Queue()
+SCRAPE_CONCURRENCY = 32
+MAX_SCRAPE_CONCURRENCY = 100  # Also the connection pool size
+EXTRACT_CACHE_SIZE = 1024
+MAX_PAGE_BYTES = 5 * 1024 * 1024  # Stop reading a page body past this size
+READ_CHUNK_SIZE = 64 * 1024
+FETCH_TIMEOUT = 15  # Seconds to connect, and between reads; waiting for a pooled connection is not limited
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
 
 # --- Regex ---
+def compile_regex(pattern):
+    """
+    Compiles a pattern with RE2's linear-time engine, falling back to re for
+    patterns RE2 rejects or when it is not installed.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
 EMAIL_REGEX = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
 PHONE_REGEX = r'(\+91|0)?[6-9][0-9]{9}'
+# Both patterns share one compiled alternation so each page is scanned once.
+CONTACT_RE = compile_regex(f'(?P<email>{EMAIL_REGEX})|(?P<phone>{PHONE_REGEX})')
+
+# LRU of body digest -> (emails, phones), so unchanged pages skip the regex scan
+_extract_cache = OrderedDict()
+_extract_cache_lock = threading.Lock()
+
+def extract_contacts(html):
+    """
+    Returns the unique emails and phone numbers in the text of raw HTML bytes,
+    ignoring markup, comments and the contents of <script> and <style> blocks.
+    Results are memoized by a hash of the body.
+    """
+    key = hashlib.blake2b(html, digest_size=16).digest()
+    with _extract_cache_lock:
+        cached = _extract_cache.get(key)
+        if cached is not None:
+            _extract_cache.move_to_end(key)
+            return cached
+
+    emails = set()
+    phones = set()
+    # lexbor parses in linear time, decodes entities and copes with unclosed tags
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(['script', 'style'])
+    text = tree.text(separator=' ')
+    for match in CONTACT_RE.finditer(text):
+        email = match.group('email')
+        if email:
+            emails.add(email)
+        else:
+            phones.add(match.group('phone'))
+    result = (frozenset(emails), frozenset(phones))
+
+    with _extract_cache_lock:
+        _extract_cache[key] = result
+        if len(_extract_cache) > EXTRACT_CACHE_SIZE:
+            _extract_cache.popitem(last=False)
+    return result
 
 # --- Async Scraping Engine ---
-async def scrape_page_for_contacts(client, page_url):
+async def scrape_page_for_contacts(session, page_url):
     """
     Asynchronously scrapes a single page for email and phone numbers.
     """
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = await client.get(page_url, timeout=15, headers=headers, follow_redirects=True)
-        response.raise_for_status()
-    except httpx.RequestError as e:
-        print(f"Error fetching URL {page_url}: {e}")
-        return {'url': page_url, 'emails': [], 'phones': [], 'error': f"Failed to fetch: {e}"}
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
-    text = soup.get_text()
-    emails = set(re.findall(EMAIL_REGEX, text))
-    phones = set(re.findall(PHONE_REGEX, text))
-    return {'url': page_url, 'emails': list(emails), 'phones': list(phones)}
+        async with session.get(page_url) as response:
+            response.raise_for_status()
+            chunks = []
+            size = 0
+            truncated = False
+            async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= MAX_PAGE_BYTES:
+                    truncated = True
+                    break
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # asyncio.TimeoutError has an empty message, so describe it explicitly
+        reason = f"timed out after {FETCH_TIMEOUT}s" if isinstance(e, asyncio.TimeoutError) else e
+        print(f"Error fetching URL {page_url}: {reason}")
+        return {'url': page_url, 'emails': [], 'phones': [], 'truncated': False, 'error': f"Failed to fetch: {reason}"}
 
-async def run_scraper(urls):
+    if truncated:
+        print(f"Page {page_url} reached the {MAX_PAGE_BYTES} byte limit, scanning only the first {size} bytes")
+
+    # Patterns and cache are shared, so extraction can run off the event loop
+    emails, phones = await asyncio.to_thread(extract_contacts, b''.join(chunks))
+    return {'url': page_url, 'emails': list(emails), 'phones': list(phones), 'truncated': truncated}
+
+async def run_scraper(session, urls, concurrency=SCRAPE_CONCURRENCY):
     """
-    Sets up and runs the concurrent scraping tasks for the provided URLs.
+    Runs the concurrent scraping tasks for the provided URLs on session,
+    keeping at most `concurrency` requests in flight.
     """
-    async with httpx.AsyncClient() as client:
-        tasks = [scrape_page_for_contacts(client, url) for url in urls]
-        results = await asyncio.gather(*tasks)
-    return results
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded_scrape(url):
+        async with semaphore:
+            return await scrape_page_for_contacts(session, url)
+
+    return await asyncio.gather(*[bounded_scrape(url) for url in urls])
 
 # --- Synchronous Data Handling ---
+def migrate_legacy_excel():
+    """
+    Imports the old Excel store into the Parquet dataset if the dataset does
+    not exist yet. Must be called with file_lock held.
+    """
+    if os.path.exists(DATA_DIR) or not os.path.exists(LEGACY_EXCEL_FILE):
+        return
+    df = pd.read_excel(LEGACY_EXCEL_FILE, dtype=str).reindex(columns=DATA_SCHEMA.names)
+    table = pa.Table.from_pandas(df, schema=DATA_SCHEMA, preserve_index=False)
+    # write_to_dataset skips empty tables, so write the file directly; this
+    # creates DATA_DIR even for a header-only workbook and the import runs once
+    os.makedirs(DATA_DIR)
+    pq.write_table(table, os.path.join(DATA_DIR, 'legacy.parquet'))
+
+_saved_contacts = None  # (emails, phones) already in DATA_DIR, loaded on first save
+
+def load_saved_contacts():
+    """
+    Returns the sets of saved emails and phone numbers, reading the dataset
+    only the first time. Must be called with file_lock held.
+    """
+    global _saved_contacts
+    if _saved_contacts is None:
+        migrate_legacy_excel()
+        if os.path.exists(DATA_DIR):
+            table = pq.read_table(DATA_DIR, schema=DATA_SCHEMA)
+            _saved_contacts = tuple(set(table.column(name).drop_null().to_pylist()) for name in DATA_SCHEMA.names)
+        else:
+            _saved_contacts = (set(), set())
+    return _saved_contacts
+
 def save_data(emails_to_save, phones_to_save):
     """
-    Saves new, unique emails and phone numbers to the Excel file.
+    Appends new, unique emails and phone numbers to the Parquet dataset.
     """
     with file_lock:
         try:
-            if os.path.exists(EXCEL_FILE):
-                df = pd.read_excel(EXCEL_FILE)
-                existing_emails = set(df['Email'].dropna())
-                existing_phones = set(df['Mobile Number'].dropna())
-            else:
-                df = pd.DataFrame(columns=['Email', 'Mobile Number'])
-                existing_emails = set()
-                existing_phones = set()
+            existing_emails, existing_phones = load_saved_contacts()
 
             new_emails = [email for email in emails_to_save if email not in existing_emails]
             new_phones = [phone for phone in phones_to_save if phone not in existing_phones]
@@ -67,43 +179,102 @@ def save_data(emails_to_save, phones_to_save):
             if not new_emails and not new_phones:
                 return
 
-            new_data = {
-                'Email': pd.Series(new_emails),
-                'Mobile Number': pd.Series(new_phones)
-            }
-            new_df = pd.DataFrame(dict([(k, pd.Series(v)) for k,v in new_data.items()]))
-
-            final_df = pd.concat([df, new_df], ignore_index=True)
-            final_df.to_excel(EXCEL_FILE, index=False)
+            # Columns are independent lists, so pad the shorter one with nulls
+            num_rows = max(len(new_emails), len(new_phones))
+            table = pa.table({
+                'Email': new_emails + [None] * (num_rows - len(new_emails)),
+                'Mobile Number': new_phones + [None] * (num_rows - len(new_phones))
+            }, schema=DATA_SCHEMA)
+            pq.write_to_dataset(table, root_path=DATA_DIR)
+            existing_emails.update(new_emails)
+            existing_phones.update(new_phones)
         except Exception as e:
-            print(f"Error saving to Excel: {e}")
+            print(f"Error saving data: {e}")
+
+def save_worker():
+    """
+    Runs in a single background thread, merging everything waiting in
+    save_queue into one save_data call per batch.
+    """
+    while True:
+        emails, phones = save_queue.get()
+        emails, phones = set(emails), set(phones)
+        batch_size = 1
+        while True:
+            try:
+                more_emails, more_phones = save_queue.get_nowait()
+            except queue.Empty:
+                break
+            emails.update(more_emails)
+            phones.update(more_phones)
+            batch_size += 1
+        try:
+            save_data(emails, phones)
+        finally:
+            for _ in range(batch_size):
+                save_queue.task_done()
+
+# --- Server Lifecycle ---
+@app.before_serving
+async def start_save_worker():
+    threading.Thread(target=save_worker, daemon=True).start()
+
+@app.after_serving
+async def flush_save_queue():
+    # Let queued saves finish before the server exits
+    await asyncio.to_thread(save_queue.join)
+
+http_session = None  # Shared across requests so connections and DNS lookups are reused
+
+@app.before_serving
+async def open_http_session():
+    global http_session
+    connector = aiohttp.TCPConnector(limit=MAX_SCRAPE_CONCURRENCY, limit_per_host=10, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=FETCH_TIMEOUT, sock_read=FETCH_TIMEOUT)
+    http_session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS)
+
+@app.after_serving
+async def close_http_session():
+    await http_session.close()
 
 # --- API Endpoints ---
+def json_response(obj, status=200):
+    """Serializes obj with orjson, which is much faster than jsonify on large result lists."""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
 @app.route('/')
-def index():
-    return render_template('index.html')
+async def index():
+    return await render_template('index.html')
 
 @app.route('/scrape', methods=['POST'])
-def scrape():
+async def scrape():
     """
-    Synchronous endpoint that calls the async scraper and aggregates results.
+    Runs the async scraper on the server's event loop and aggregates results.
     """
-    data = request.get_json()
+    data = await request.get_json(force=True, silent=True)
+    if not isinstance(data, dict): return json_response({'error': 'A JSON object body is required'}, 400)
     urls_raw = data.get('urls')
-    if not urls_raw or not isinstance(urls_raw, list): return jsonify({'error': 'A list of URLs is required'}), 400
+    if not urls_raw or not isinstance(urls_raw, list): return json_response({'error': 'A list of URLs is required'}, 400)
 
     urls_to_scrape = []
     for raw_url in urls_raw:
         url = raw_url.strip()
         if not url: continue
-        if not url.startswith('http://') and not url.startswith('https://'):
+        if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         urls_to_scrape.append(url)
-    
-    if not urls_to_scrape: return jsonify({'error': 'No valid URLs provided'}), 400
+
+    # Fetch each URL once, even if it was entered more than once
+    urls_to_scrape = list(dict.fromkeys(urls_to_scrape))
+    if not urls_to_scrape: return json_response({'error': 'No valid URLs provided'}, 400)
+
+    concurrency = data.get('concurrency', SCRAPE_CONCURRENCY)
+    if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+        return json_response({'error': 'concurrency must be a positive integer'}, 400)
+    concurrency = min(concurrency, MAX_SCRAPE_CONCURRENCY)
 
     # Run scraper and get results
-    results = asyncio.run(run_scraper(urls_to_scrape))
+    results = await run_scraper(http_session, urls_to_scrape, concurrency)
 
     # Aggregate all emails and phones into two flat, unique lists
     all_emails = set()
@@ -119,40 +290,64 @@ def scrape():
     email_list = list(all_emails)
     phone_list = list(all_phones)
 
-    # Save data in a background thread
-    threading.Thread(target=save_data, args=(email_list, phone_list)).start()
+    # Hand the data to the background writer
+    save_queue.put((email_list, phone_list))
 
-    return jsonify({'emails': email_list, 'phones': phone_list})
+    # Pages cut off at MAX_PAGE_BYTES, whose later contacts were not scanned
+    truncated_urls = [res['url'] for res in results if res['truncated']]
+
+    return json_response({'emails': email_list, 'phones': phone_list, 'truncated': truncated_urls})
+
+def read_saved_data():
+    """Reads the whole dataset, or returns None if nothing has been saved yet."""
+    with file_lock:
+        migrate_legacy_excel()
+        if not os.path.exists(DATA_DIR): return None
+        return pd.read_parquet(DATA_DIR)
+
+def export_saved_data(filetype):
+    """
+    Converts the whole dataset for download and returns (data, mimetype, filename),
+    or None if nothing has been saved yet. Raises ValueError for an unknown
+    filetype. Blocks on file_lock and on the conversion, so run it in a thread.
+    """
+    df = read_saved_data()
+    if df is None: return None
+    output = BytesIO()
+    filename, mimetype = f"scraped_data.{filetype}", f"text/{filetype}"
+
+    if filetype == 'excel':
+        df.to_excel(output, index=False, sheet_name='Scraped Data')
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        filename = 'scraped_data.xlsx'
+    elif filetype == 'csv':
+        df.to_csv(output, index=False, encoding='utf-8')
+    elif filetype == 'json':
+        # For this simpler structure, a different JSON format might be better
+        json_data = {
+            "emails": df["Email"].dropna().tolist(),
+            "mobile_numbers": df["Mobile Number"].dropna().tolist()
+        }
+        output.write(pd.io.json.dumps(json_data, indent=4).encode('utf-8'))
+        mimetype = 'application/json'
+    else:
+        raise ValueError(f"Unknown file type: {filetype}")
+
+    return output.getvalue(), mimetype, filename
 
 @app.route('/download/<filetype>')
-def download_file(filetype):
+async def download_file(filetype):
     """Serves the collected data file for download."""
-    with file_lock:
-        if not os.path.exists(EXCEL_FILE): return "No data file found.", 404
-        df = pd.read_excel(EXCEL_FILE)
-        output = BytesIO()
-        filename, mimetype = f"scraped_data.{filetype}", f"text/{filetype}"
-        
-        if filetype == 'excel':
-            df.to_excel(output, index=False, sheet_name='Scraped Data')
-            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            filename = 'scraped_data.xlsx'
-        elif filetype == 'csv':
-            df.to_csv(output, index=False, encoding='utf-8')
-        elif filetype == 'json':
-            # For this simpler structure, a different JSON format might be better
-            json_data = {
-                "emails": df["Email"].dropna().tolist(),
-                "mobile_numbers": df["Mobile Number"].dropna().tolist()
-            }
-            output.write(pd.io.json.dumps(json_data, indent=4).encode('utf-8'))
-            mimetype = 'application/json'
-        else:
-            return "Invalid file type requested.", 400
-        
-        output.seek(0)
-        return send_file(output, mimetype=mimetype, as_attachment=True, download_name=filename)
+    # Reading and converting the dataset is slow, so keep it off the event loop
+    try:
+        export = await asyncio.to_thread(export_saved_data, filetype)
+    except ValueError:
+        return "Invalid file type requested.", 400
+    if export is None: return "No data file found.", 404
+
+    data, mimetype, filename = export
+    return await send_file(BytesIO(data), mimetype=mimetype, as_attachment=True, attachment_filename=filename)
 
 # --- Main ---
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    uvicorn.run('app:app', reload=True)
\ No newline at end of file
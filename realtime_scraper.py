@@ -1,16 +1,37 @@
 import requests
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import re
 import pandas as pd
 import time
+import hashlib
+import sys
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+def compile_regex(pattern):
+    """Compiles a pattern with RE2 if possible, otherwise with re."""
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
+EMAIL_RE = compile_regex(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+MOBILE_RE = compile_regex(r"\b(?:\+?\d{1,3}[-.\s]?)?\d{10}\b")
+# Separators MOBILE_RE allows between the country code and the number: '-',
+# '.' and every character stdlib re's \s matches (RE2's \s is ASCII-only)
+MOBILE_SEPARATORS = str.maketrans('', '', '-. \t\n\v\f\r\x1c\x1d\x1e\x1f\x85\xa0\u1680'
+                                  '\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a'
+                                  '\u2028\u2029\u202f\u205f\u3000')
 
 def extract_data(text):
-    """Extracts emails and mobile numbers from a given text."""
-    email_pattern = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-    mobile_pattern = r"\b(?:\+?\d{1,3}[-.\s]?)?\d{10}\b"
-    
-    emails = list(set(re.findall(email_pattern, text)))
-    mobiles = list(set(re.findall(mobile_pattern, text)))
+    """Extracts the sets of unique emails and mobile numbers from a given text."""
+    emails = set(EMAIL_RE.findall(text))
+    mobiles = {mobile.translate(MOBILE_SEPARATORS) for mobile in MOBILE_RE.findall(text)}
     
     return emails, mobiles
 
@@ -20,8 +41,9 @@ def scrape_site(url):
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
         response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()  # Raise an exception for bad status codes
-        soup = BeautifulSoup(response.text, "html.parser")
-        return soup.get_text()
+        tree = LexborHTMLParser(response.text)
+        tree.strip_tags(["script", "style"])
+        return tree.text()
     except requests.exceptions.RequestException as e:
         print(f"Error scraping {url}: {e}")
         return None
@@ -48,8 +70,6 @@ def save_to_excel(data, filename="scraped_output.xlsx"):
         df.to_excel(filename, index=False, sheet_name='Sheet1')
 
 
-import sys
-
 def main():
     print("=== Real-time Web Scraping Tool (Email + Mobile Extractor) ===")
     if len(sys.argv) > 1:
@@ -60,40 +80,52 @@ def main():
     
     interval = 5  # Default interval set to 5 seconds to avoid interactive input
 
-    scraped_data = []
+    seen_emails = set()
+    seen_mobiles = set()
     # Load existing data to avoid duplicates
     try:
-        existing_df = pd.read_excel("scraped_output.xlsx")
+        # Read values as text and normalize mobiles the way extract_data does,
+        # so numbers saved with separators are recognised as already seen
+        existing_df = pd.read_excel("scraped_output.xlsx", dtype=str)
         for index, row in existing_df.iterrows():
             if 'Type' in row and 'Value' in row:
-                scraped_data.append(row.to_dict())
+                if pd.isna(row['Value']):
+                    continue
+                if row['Type'] == 'Email':
+                    seen_emails.add(row['Value'])
+                elif row['Type'] == 'Mobile':
+                    seen_mobiles.add(row['Value'].translate(MOBILE_SEPARATORS))
             elif 'Email' in row and pd.notna(row['Email']):
-                scraped_data.append({'Timestamp': pd.Timestamp.now(), 'Type': 'Email', 'Value': row['Email']})
+                seen_emails.add(row['Email'])
             elif 'Mobile Number' in row and pd.notna(row['Mobile Number']):
-                scraped_data.append({'Timestamp': pd.Timestamp.now(), 'Type': 'Mobile', 'Value': row['Mobile Number']})
+                seen_mobiles.add(row['Mobile Number'].translate(MOBILE_SEPARATORS))
     except FileNotFoundError:
         pass
 
 
+    last_digest = None  # Hash of the last page text, to skip re-extracting unchanged pages
     try:
         while True:
             print(f"\nScraping {url}...")
             text = scrape_site(url)
-            
-            if text:
+            digest = hashlib.blake2b(text.encode(), digest_size=16).digest() if text else None
+
+            if text and digest == last_digest:
+                print("Page unchanged, no new data found.")
+            elif text:
+                last_digest = digest
                 emails, mobiles = extract_data(text)
                 
-                new_data = []
-                for email in emails:
-                    if email not in [item['Value'] for item in scraped_data if item['Type'] == 'Email']:
-                        new_data.append({'Timestamp': pd.Timestamp.now(), 'Type': 'Email', 'Value': email})
-                
-                for mobile in mobiles:
-                    if mobile not in [item['Value'] for item in scraped_data if item['Type'] == 'Mobile']:
-                        new_data.append({'Timestamp': pd.Timestamp.now(), 'Type': 'Mobile', 'Value': mobile})
+                new_emails = emails - seen_emails
+                new_mobiles = mobiles - seen_mobiles
+                seen_emails |= new_emails
+                seen_mobiles |= new_mobiles
+
+                now = pd.Timestamp.now()
+                new_data = [{'Timestamp': now, 'Type': 'Email', 'Value': email} for email in new_emails]
+                new_data += [{'Timestamp': now, 'Type': 'Mobile', 'Value': mobile} for mobile in new_mobiles]
 
                 if new_data:
-                    scraped_data.extend(new_data)
                     save_to_excel(new_data)
                     print(f"Found {len(new_data)} new items.")
                 else:
@@ -0,0 +1,23 @@
+import time
+
+from app import extract_contacts
+
+
+def test_extract_contacts_ignores_markup_and_decodes_entities():
+    html = b'<img src="logo@2x.png" srcset="hero@2x.jpg 2x"> Contact info&#64;example.com or +919876543210'
+    emails, phones = extract_contacts(html)
+    assert emails == {'info@example.com'}
+    assert phones == {'+919876543210'}
+
+
+def test_extract_contacts_skips_scripts_styles_and_comments():
+    html = b'<script>a@b.com</script><style>c@d.com</style><!-- x > e@f.com --><p>g@h.com</p>'
+    emails, _ = extract_contacts(html)
+    assert emails == {'g@h.com'}
+
+
+def test_extract_contacts_is_linear_on_unclosed_tags():
+    for html in (b'<script ' * 20000, b'<' * 50000):
+        start = time.perf_counter()
+        extract_contacts(html)
+        assert time.perf_counter() - start < 1